@@ -3,24 +3,14 @@ import subprocess
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from bs4 import BeautifulSoup
 import os
 import logging
-from models.twitter_result import TwitterResult
 from datetime import datetime, UTC
-import json
-from cachetools import TTLCache
-from selenium.webdriver.common.action_chains import ActionChains
 import threading
 
 from services.cache_service import CacheService
 from services.driver_service import DriverService
+from services.driver_pool import DriverPool
 from services.twitter_service import TwitterService
 
 
@@ -72,7 +62,8 @@ CORS(app)
 # Initialize services at module level
 cache_service = CacheService()
 driver_service = DriverService()
-twitter_service = TwitterService(driver_service, cache_service)
+driver_pool = DriverPool(driver_service, size=int(os.getenv('DRIVER_POOL_SIZE', '1')))
+twitter_service = TwitterService(driver_service, cache_service, driver_pool)
 
 # Add request lock to prevent concurrent Chrome sessions
 request_lock = threading.Lock()
@@ -84,6 +75,8 @@ def init_app():
     """Initialize application resources"""
     global ready
     logger.info("Initializing services...")
+    # Warm the driver pool in the background so startup isn't blocked on Chrome
+    threading.Thread(target=driver_pool.prime, daemon=True).start()
     ready = True
 
 @app.before_request
@@ -100,12 +93,7 @@ def check_ready():
 with app.app_context():
     init_app()
 
-@app.teardown_appcontext
-def cleanup_context(exception=None):
-    """Cleanup resources when the application context ends"""
-    driver_service.cleanup_all_drivers()
-
-# Register cleanup on process termination
+# Pooled drivers outlive individual requests, so they are only cleaned up on process termination
 import atexit
 atexit.register(driver_service.cleanup_all_drivers)
 
@@ -269,301 +257,4 @@ def handle_exception(e):
     }), 500
 
 if __name__ == '__main__':
-    app.run(debug=True)
-    
-    
-def extract_tweet_url(tweet_div):
-    # Look for a link with data-testid="tweetText"
-    tweet_link = tweet_div.find('a', {'data-testid': 'tweetText'})
-    
-    if tweet_link and 'href' in tweet_link.attrs:
-        # Extract the relative URL
-        relative_url = tweet_link['href']
-        
-        # Construct the full URL
-        full_url = f"https://x.com{relative_url}"
-        return full_url
-        # URL encode the full URL
-        #return urllib.parse.quote(full_url, safe='')
-    
-    # Fallback: look for any link containing "/status/"
-    status_link = tweet_div.find('a', href=lambda href: href and '/status/' in href)
-    
-    if status_link and 'href' in status_link.attrs:
-        relative_url = status_link['href']
-        full_url = f"https://x.com{relative_url}"
-        
-        # URL encode the full URL
-        #return urllib.parse.quote(full_url, safe='')
-        return full_url
-    
-    # If no suitable link is found
-    return None
-
-def datetime_to_iso(obj):
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    raise TypeError("Type not serializable")
-
-    
-def get_recent_posts(driver, num_posts=5):
-    try:
-        # Wait for tweets to load
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "article[data-testid='tweet']"))
-        )
-        
-        # Get the page source and parse it with BeautifulSoup
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
-        
-        # Find all tweet articles
-        tweets = soup.find_all('article', attrs={'data-testid': 'tweet'})
-        recent_posts = []
-        for tweet in tweets[:num_posts]:
-            # Extract username
-            #username = tweet.find('div', attrs={'data-testid': 'User-Name'}).text
-            full_name = tweet.find('div', attrs={'data-testid': 'User-Name'}).text
-            channel, username = full_name.split('@', 1)
-            username = '@' + username  # Add @ back to the username
-            # Extract tweet text
-            tweet_text = tweet.find('div', attrs={'data-testid': 'tweetText'}).text if tweet.find('div', attrs={'data-testid': 'tweetText'}) else ''
-            # Extract timestamp
-            embed_url = extract_tweet_url(tweet)
-            timestamp_element = tweet.find('time')
-            timestamp = timestamp_element['datetime'] if timestamp_element else datetime.now(UTC).isoformat()
-
-            
-            tweet = TwitterResult(  
-                channel=channel,
-                username=username,
-                description=tweet_text,
-                published_date=timestamp,
-                embed_url=embed_url
-            )
-            recent_posts.append(tweet)
-        
-        logger.info(f"Retrieved {len(recent_posts)} recent posts")
-        tweet_dicts = [tweet.__dict__ for tweet in recent_posts]
-
-        # Convert the list of dictionaries to JSON
-        json_data = json.dumps(tweet_dicts, default=datetime_to_iso)
-        return json_data
-    except Exception as e:
-        logger.error(f"Error retrieving recent posts: {str(e)}")
-        raise
-
-
-def click_latest_button(driver):
-    latest_button_xpath = "//span[text()='Latest']"
-    try:
-        latest_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, latest_button_xpath))
-        )
-        latest_button.click()
-        logger.info("Latest button clicked successfully")
-    except TimeoutException:
-        logger.error("Latest button not found or not clickable")
-        raise
-    
-def perform_channel_search(driver, search_query):
-    
-    url = "https://x.com/" + search_query
-    try:
-        driver.get(url)
-        # Wait for either the ScrollSnap-List or the "account doesn't exist" message
-        element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="ScrollSnap-List"], [data-testid="emptyState"]'))
-        )
-        
-        #time.sleep(25)
-        # Check if the account doesn't exist
-        if element.get_attribute('data-testid') == 'emptyState':
-            logger.info(f"Account {search_query} doesn't exist")
-            return False  # Indicate that the search was unsuccessful
-        
-        logger.info(f"Channel Search performed successfully for query: {search_query}")
-        return True  # Indicate that the search was successful
-    except TimeoutException:
-        logger.error(f"Timeout while searching for channel: {search_query}")
-        return False
-    except Exception as e:
-        logger.error(f"Error during channel search for {search_query}: {str(e)}")
-        return False
-    
-    
-def setup_driver():
-    # Setup Chrome options (you might need to adjust this based on your environment)
-    chrome_options = webdriver.ChromeOptions()
-    #chrome_options.add_argument("--headless")  # Run in headless mode
-    return webdriver.Chrome(options=chrome_options)
-    
-def find_input_element(driver):
-    selectors = [
-        (By.CSS_SELECTOR, "input[name='text'][autocomplete='username']"),
-        (By.CSS_SELECTOR, "input.r-30o5oe.r-1dz5y72.r-13qz1uu"),
-        (By.XPATH, "//input[@autocapitalize='sentences' and @autocomplete='username']"),
-        (By.CSS_SELECTOR, "input[type='text'][dir='auto']"),
-    ]
-    for by, selector in selectors:
-        try:
-            return WebDriverWait(driver, 10).until(EC.presence_of_element_located((by, selector)))
-        except TimeoutException:
-            continue
-    raise NoSuchElementException("Could not find username input field")
-
-
-def find_password_input(driver):
-    selectors = [
-        (By.CSS_SELECTOR, "input[name='password'][type='password']"),
-        (By.CSS_SELECTOR, "input[autocomplete='current-password']"),
-        (By.XPATH, "//input[@type='password' and contains(@class, 'r-30o5oe')]"),
-    ]
-    for by, selector in selectors:
-        try:
-            return WebDriverWait(driver, 5).until(EC.presence_of_element_located((by, selector)))
-        except TimeoutException:
-            continue
-    raise NoSuchElementException("Could not find password input field")
-
-def click_next_button(driver):
-    next_button_xpath = "//button[@role='button']//span[contains(text(), 'Next')]"
-    try:
-        next_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, next_button_xpath))
-        )
-        next_button.click()
-        logger.info("Next button clicked successfully")
-    except TimeoutException:
-        logger.error("Next button not found or not clickable")
-        raise
-
-def click_login_button(driver):
-    login_button_selector = "[data-testid='LoginForm_Login_Button']"
-    try:
-        login_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, login_button_selector))
-        )
-        # Check if the button is disabled
-        if login_button.get_attribute("disabled"):
-            logger.warning("Login button is disabled. Waiting for it to become enabled...")
-            WebDriverWait(driver, 10).until_not(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, login_button_selector + "[disabled]"))
-            )
-            login_button = driver.find_element(By.CSS_SELECTOR, login_button_selector)
-        
-        login_button.click()
-        logger.info("Login button clicked successfully")
-    except TimeoutException:
-        logger.error("Login button not found or not clickable")
-        raise
-    
-def handle_optional_step(driver):
-    optional_step_text = "Enter your phone number or username"
-    phone_number = os.getenv('TWITTER_PHONE_NUMBER')
-    try:
-        WebDriverWait(driver, 5).until(
-            EC.presence_of_element_located((By.XPATH, f"//span[contains(text(), '{optional_step_text}')]"))
-        )
-        logger.info("Optional step detected")
-        optional_input = WebDriverWait(driver, 5).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "input[data-testid='ocfEnterTextTextInput']"))
-        )
-        optional_input.send_keys(phone_number)
-        logger.info("phone_number entered in optional step")
-        click_next_button(driver)
-    except TimeoutException:
-        logger.info("Optional step not present, continuing with normal flow")
-        
-def perform_search(driver, search_query):
-    search_input_selector = "[data-testid='SearchBox_Search_Input']"
-    try:
-        search_input = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, search_input_selector))
-        )
-        
-        # Attempt 1: Use clear() method
-        search_input.clear()
-        if not search_input.get_attribute('value'):
-            logger.info("Input cleared successfully using clear() method")
-        else:
-            # Attempt 2: Use CTRL+A and BACKSPACE
-            ActionChains(driver).click(search_input).key_down(Keys.CONTROL).send_keys('a').key_up(Keys.CONTROL).send_keys(Keys.BACKSPACE).perform()
-            if not search_input.get_attribute('value'):
-                logger.info("Input cleared successfully using CTRL+A and BACKSPACE")
-            else:
-                # Attempt 3: Send a series of BACKSPACE keys
-                current_value = search_input.get_attribute('value')
-                for _ in range(len(current_value)):
-                    search_input.send_keys(Keys.BACKSPACE)
-                if not search_input.get_attribute('value'):
-                    logger.info("Input cleared successfully using multiple BACKSPACE keys")
-                else:
-                    logger.warning("Failed to clear input field")
-
-        search_input.send_keys(search_query)
-        search_input.send_keys(Keys.RETURN)
-        logger.info(f"Search performed with query: {search_query}")
-    except TimeoutException:
-        logger.error("Search input not found")
-        raise
-    
-    def check_login_status(driver):
-        search_input_selector = "[data-testid='SearchBox_Search_Input']"
-        try:
-            search_input = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, search_input_selector))
-            )
-            return True
-        except TimeoutException:
-            return False
-        
-def perform_twitter_operation(url, search_queries, operation_type):
-    global cache
-    cache_key = f'{operation_type}_posts'
-    
-    if cache_key in cache:
-        logger.info(f"Returning cached {operation_type} posts")
-        return jsonify({"data": cache[cache_key]})
-    
-    if not search_queries:
-        return jsonify({"error": "No search queries provided"}), 400
-
-    driver = setup_driver()
-    try:
-        driver.get(url)
-        login(driver)
-        
-        results = {}
-        for search_query in search_queries:
-            if operation_type == 'channel':
-                success = perform_channel_search(driver, search_query)
-            else:
-                perform_search(driver, search_query)
-                click_latest_button(driver)
-            
-            recent_posts = get_recent_posts(driver)
-            results[search_query] = json.loads(recent_posts)
-
-        cache[cache_key] = results
-        return jsonify({"data": results})
-
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    finally:
-        driver.quit()
-        
-def login(driver):
-    username = os.getenv('TWITTER_USERNAME')
-    password = os.getenv('TWITTER_PASSWORD')
-    logging.info(f"Logging in with username: {username} and password: {password}")
-    username_input = find_input_element(driver)
-    username_input.send_keys(username)
-    click_next_button(driver)
-
-    handle_optional_step(driver)
-
-    password_input = find_password_input(driver)
-    password_input.send_keys(password)
-    
-    click_login_button(driver)
\ No newline at end of file
+    app.run(debug=True)
\ No newline at end of file
@@ -1,9 +1,16 @@
 from cachetools import TTLCache
 from datetime import datetime
+import threading
+import time
 
 class CacheService:
-    def __init__(self, maxsize=100, ttl=3600):  # 1 hour default TTL
+    def __init__(self, maxsize=100, ttl=3600, soft_ttl=300):  # 1 hour hard TTL, refresh after 5 minutes
         self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Entries older than soft_ttl are still served but should be refreshed in the background
+        self.soft_ttl = soft_ttl
+        # TTLCache is not thread-safe (every access runs expire()), and background refreshes
+        # write to it while request threads read
+        self._lock = threading.Lock()
         self.stats = {
             'hits': 0,
             'misses': 0,
@@ -11,31 +18,49 @@ class CacheService:
         }
 
     def get(self, key):
-        value = self.cache.get(key)
-        if value is not None:
-            self.stats['hits'] += 1
-        else:
-            self.stats['misses'] += 1
+        value, _ = self.get_with_age(key)
         return value
 
+    def get_with_age(self, key):
+        """
+        Look up a cached value together with how long ago it was stored.
+        Returns:
+            tuple: (value, age in seconds), or (None, None) on a miss
+        """
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None, None
+            self.stats['hits'] += 1
+        stored_at, value = entry
+        return value, time.time() - stored_at
+
     def set(self, key, value):
-        self.cache[key] = value
+        with self._lock:
+            self.cache[key] = (time.time(), value)
 
     def has(self, key):
-        return key in self.cache
+        with self._lock:
+            return key in self.cache
 
     def clear(self):
-        self.cache.clear()
-        self.stats['last_cleared'] = datetime.utcnow()
+        with self._lock:
+            self.cache.clear()
+            self.stats['last_cleared'] = datetime.utcnow()
 
     def remove(self, key):
-        if key in self.cache:
-            del self.cache[key]
+        with self._lock:
+            self.cache.pop(key, None)
 
     def get_stats(self):
+        with self._lock:
+            current_size = len(self.cache)
+            stats = dict(self.stats)
         return {
-            **self.stats,
-            'current_size': len(self.cache),
+            **stats,
+            'current_size': current_size,
             'max_size': self.cache.maxsize,
-            'ttl': self.cache.ttl
+            'ttl': self.cache.ttl,
+            'soft_ttl': self.soft_ttl
         }
\ No newline at end of file
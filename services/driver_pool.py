@@ -0,0 +1,99 @@
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+class DriverPool:
+    """Bounded pool of warmed Chrome drivers that are reused across requests"""
+
+    def __init__(self, driver_service, size=1):
+        self.driver_service = driver_service
+        self.size = size
+        self._idle = queue.Queue(maxsize=size)
+        # Each slot owns a stable Chrome profile directory that outlives individual drivers
+        self._free_slots = list(range(size))
+        self._slots = {}  # driver -> slot index
+        self._lock = threading.Lock()
+
+    def _reserve_slot(self):
+        """Reserve a free slot for a new driver; returns None if the pool is already full"""
+        with self._lock:
+            return self._free_slots.pop(0) if self._free_slots else None
+
+    def _free_slot(self, slot):
+        with self._lock:
+            self._free_slots.append(slot)
+
+    def _create_driver(self, slot, warm=False):
+        try:
+            driver = self.driver_service.setup_driver(warm=warm, slot=slot)
+        except Exception:
+            self._free_slot(slot)
+            raise
+        with self._lock:
+            self._slots[driver] = slot
+        return driver
+
+    def prime(self):
+        """Fill the pool with warmed drivers so the first requests don't pay for Chrome startup"""
+        logger.info(f"Priming driver pool with {self.size} driver(s)")
+        while True:
+            slot = self._reserve_slot()
+            if slot is None:
+                break
+            try:
+                driver = self._create_driver(slot, warm=True)
+            except Exception as e:
+                logger.error(f"Error priming driver pool: {str(e)}")
+                return
+            self._idle.put_nowait(driver)
+        logger.info("Driver pool primed")
+
+    def acquire(self, timeout=60):
+        """
+        Get a driver from the pool, creating one lazily if the pool isn't full yet.
+        Args:
+            timeout: Seconds to wait for a driver to be released when the pool is exhausted
+        Returns:
+            WebDriver: A ready-to-use driver; hand it back with release()
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        slot = self._reserve_slot()
+        if slot is not None:
+            return self._create_driver(slot)
+
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise Exception("Timed out waiting for an available Chrome driver")
+
+    def release(self, driver):
+        """
+        Return a driver to the pool, or replace it lazily if it is unhealthy.
+        Cookies are kept so the next request can reuse the logged-in session.
+        """
+        if not driver:
+            return
+        try:
+            driver.current_url  # Raises if the browser or chromedriver has died
+            driver.get("about:blank")
+        except Exception as e:
+            logger.warning(f"Discarding unhealthy driver: {str(e)}")
+            self.discard(driver)
+            return
+        self._idle.put_nowait(driver)
+
+    def discard(self, driver):
+        """Close a driver and free its slot so a replacement can be created on demand"""
+        try:
+            self.driver_service.close_driver(driver)
+        finally:
+            with self._lock:
+                slot = self._slots.pop(driver, None)
+            if slot is not None:
+                self._free_slot(slot)
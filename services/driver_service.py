@@ -11,105 +11,444 @@ from pathlib import Path
 import time
 import uuid  # Added for unique directory names
 import psutil  # Added for process management
+import threading
+import signal
+import select
+import socket
+import base64
+import itertools
+import json
+import urllib.request
+import websocket  # websocket-client, used for direct CDP connections
+from concurrent.futures import ThreadPoolExecutor
 
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
 logger = logging.getLogger(__name__)
 
+# Realistic user agent for Windows 10 and Chrome; sent both as the launch flag and via CDP so
+# the HTTP header and navigator.userAgent agree
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
+
+# Injected into every new document (including iframes) before any page script runs
+ANTI_DETECT_JS = """
+Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
+Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});
+window.chrome = window.chrome || {runtime: {}};
+if (window.Notification) {
+    Object.defineProperty(Notification, 'permission', {get: () => 'default'});
+}
+"""
+
+# Directory name prefix for the stable Chrome profiles owned by driver pool slots
+SLOT_PROFILE_PREFIX = 'slot_'
+
+# Logged-in session cookies, saved so a restarted app can skip the full login flow
+COOKIE_FILE = os.path.join(os.getcwd(), 'session', 'cookies.json')
+_COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite')
+
+# Media, font, ad and telemetry fetches the scraper never reads; blocked to cut page weight
+_BLOCKED_URL_PATTERNS = [
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.svg',
+    '*.mp4', '*.webm', '*.m3u8', '*video.twimg.com*',
+    '*abs.twimg.com*/emoji/*',
+    '*.woff', '*.woff2', '*.ttf',
+    '*google-analytics*', '*doubleclick*', '*/i/api/1.1/jot/*',
+]
+
+# Login form selectors, tried in order; kept at module level so they aren't rebuilt per login
+_USERNAME_SELECTORS = (
+    (By.CSS_SELECTOR, "input[name='text'][autocomplete='username']"),
+    (By.CSS_SELECTOR, "input.r-30o5oe.r-1dz5y72.r-13qz1uu"),
+    (By.XPATH, "//input[@autocapitalize='sentences' and @autocomplete='username']"),
+    (By.CSS_SELECTOR, "input[type='text'][dir='auto']"),
+    (By.CSS_SELECTOR, "input[data-testid='ocfEnterTextTextInput']"),
+    (By.CSS_SELECTOR, "input[autocomplete='username']"),
+    (By.CSS_SELECTOR, "input[type='text']"),
+)
+
+_PASSWORD_SELECTORS = (
+    (By.CSS_SELECTOR, "input[name='password'][type='password']"),
+    (By.CSS_SELECTOR, "input[autocomplete='current-password']"),
+    (By.XPATH, "//input[@type='password' and contains(@class, 'r-30o5oe')]"),
+    (By.CSS_SELECTOR, "input[type='password']"),
+    (By.CSS_SELECTOR, "[data-testid='password-field']"),
+    (By.XPATH, "//input[contains(@class, 'password-field')]"),
+    (By.XPATH, "//div[contains(@class, 'LoginForm')]//input[@type='password']"),
+)
+
+_NEXT_SELECTORS = (
+    (By.XPATH, "//button[@role='button']//span[contains(text(), 'Next')]"),
+    (By.XPATH, "//div[@role='button']//span[contains(text(), 'Next')]"),
+    (By.XPATH, "//*[contains(text(), 'Next')][@role='button']"),
+    (By.XPATH, "//button[.//span[contains(text(), 'Next')]]"),
+)
+
+_LOGIN_SELECTORS = (
+    (By.CSS_SELECTOR, "[data-testid='LoginForm_Login_Button']"),
+    (By.XPATH, "//button[@role='button']//span[contains(text(), 'Log in')]"),
+    (By.XPATH, "//div[@role='button' and contains(., 'Log in')]"),
+    (By.XPATH, "//button[contains(., 'Log in')]"),
+)
+
+# Resolves a whole selector list in one round-trip: returns the first visible (and, unless
+# requireEnabled is false, enabled) match or null
+_FIND_FIRST_JS = """
+const [selectors, root, requireEnabled] = arguments;
+const context = root || document;
+for (const [by, selector] of selectors) {
+    let e = null;
+    try {
+        e = by === 'xpath'
+            ? document.evaluate(selector, context, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+            : context.querySelector(selector);
+    } catch (err) {
+        continue;  // Invalid selector for this engine, try the next one
+    }
+    if (e && e.offsetParent !== null && (!requireEnabled || !e.disabled)) return e;
+}
+return null;
+"""
+
+# Fills an input and clicks a button in one script. Uses the native value setter so React's
+# change tracking sees the new value; returns false if no enabled button was found.
+_FILL_AND_CLICK_JS = """
+const [input, value, buttonTestId, buttonText] = arguments;
+input.focus();
+const setValue = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+setValue.call(input, value);
+input.dispatchEvent(new Event('input', {bubbles: true}));
+let button = buttonTestId ? document.querySelector(`[data-testid="${buttonTestId}"]`) : null;
+if (!button) {
+    button = Array.from(document.querySelectorAll('button, [role="button"]'))
+        .find(b => b.textContent.trim() === buttonText);
+}
+if (!button || button.disabled || button.getAttribute('aria-disabled') === 'true') return false;
+button.click();
+return true;
+"""
+
 class DriverService:
+    # Resolved chromedriver binary path, shared by every driver this process creates
+    _driver_path = None
+    _driver_path_lock = threading.Lock()
+
     def __init__(self):
         self.active_drivers = set()
         self.temp_dirs = set()
-        self._cleanup_existing_chrome_dirs()
+        self._cdp_connections = {}  # driver -> (websocket, message id counter)
+        self._cdp_unavailable = set()  # drivers whose direct CDP socket could not be opened
+        self._driver_pgids = {}  # driver -> process group ids of chromedriver and its Chrome
+        self._driver_to_tempdir = {}  # driver -> Chrome profile directory it was launched with
+        self._cookie_lock = threading.Lock()
+        # Run startup cleanup in the background so the app can accept requests immediately
+        self._cleanup_done = threading.Event()
+        threading.Thread(target=self._cleanup_existing_chrome_dirs, daemon=True).start()
+
+    def _signal_and_wait(self, procs, send_signal, timeout):
+        """
+        Signal a batch of processes and wait for all of them to exit.
+        On Linux a pidfd per process is registered with one poll() object, so we wake
+        the moment the last process exits; elsewhere falls back to psutil.wait_procs.
+        Args:
+            procs: List of psutil.Process objects
+            send_signal: Callable invoked with each process, e.g. lambda p: p.kill(), or None
+                if the processes were already signalled (e.g. as a group via killpg)
+            timeout: Seconds to wait for the whole batch
+        Returns:
+            list: Processes still alive after the timeout
+        """
+        if not procs:
+            return []
 
-    def _kill_chrome_processes(self):
-        """Selectively kill Chrome processes that were started by this application"""
+        pidfds = {}
+        use_pidfd = hasattr(os, 'pidfd_open')
+        try:
+            # Open pidfds before signalling so a recycled PID can't be mistaken for ours
+            if use_pidfd:
+                try:
+                    for proc in procs:
+                        try:
+                            pidfds[os.pidfd_open(proc.pid)] = proc
+                        except ProcessLookupError:
+                            continue
+                except OSError as e:
+                    logger.debug(f"pidfd_open unavailable, using psutil wait: {str(e)}")
+                    use_pidfd = False
+
+            for proc in procs if send_signal else ():
+                try:
+                    send_signal(proc)
+                except psutil.NoSuchProcess:
+                    continue
+
+            if not use_pidfd:
+                gone, alive = psutil.wait_procs(procs, timeout=timeout)
+                return alive
+
+            poller = select.poll()
+            for fd in pidfds:
+                poller.register(fd, select.POLLIN)
+            deadline = time.monotonic() + timeout
+            while pidfds:
+                remaining_ms = int((deadline - time.monotonic()) * 1000)
+                if remaining_ms <= 0:
+                    break
+                for fd, _ in poller.poll(remaining_ms):
+                    poller.unregister(fd)
+                    pidfds.pop(fd, None)
+                    os.close(fd)
+            return list(pidfds.values())
+        finally:
+            for fd in pidfds:
+                os.close(fd)
+
+    def _reap_processes(self, procs):
+        """Reap any of our own exited children so they don't linger as zombies"""
+        for proc in procs:
+            try:
+                os.waitpid(proc.pid, os.WNOHANG)
+            except (ChildProcessError, OSError):
+                # Not our child (e.g. a Chrome grandchild); its parent reaps it
+                continue
+
+    def _kill_chrome_processes(self, profile_dirs=None):
+        """
+        Selectively kill Chrome processes that were started by this application.
+        Args:
+            profile_dirs: Profile directories to match; defaults to the ones this service created
+        """
         logger.info("Starting Chrome process cleanup")
         try:
-            # Only kill Chrome processes that match our specific pattern or were created by this script
+            # Only kill Chrome processes whose command line references one of our profile directories
             # This prevents killing the user's regular Chrome instances
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+            # Match the exact flag (not a substring) so e.g. slot_1 never matches slot_10
+            if profile_dirs is None:
+                profile_dirs = self.temp_dirs
+            profile_flags = {f'--user-data-dir={profile_dir}' for profile_dir in profile_dirs}
+            if not profile_flags:
+                logger.info("No Chrome profiles tracked, nothing to clean up")
+                return
+
+            targets = []
+            for proc in psutil.process_iter(['name']):
                 try:
-                    # Check if it's a Chrome process
-                    if any(browser in proc.info['name'].lower() for browser in ['chrome', 'chromium', 'chromedriver']):
-                        # Check if it's one of our Chrome instances by looking for our temp directory in command line
-                        cmdline = proc.cmdline() if 'cmdline' in proc.info else []
-                        is_our_chrome = False
-                        
-                        # Check if this is a Chrome instance we started
-                        for temp_dir in self.temp_dirs:
-                            if any(temp_dir in cmd for cmd in cmdline if isinstance(cmd, str)):
-                                is_our_chrome = True
-                                break
-                        
-                        # Only kill if it's our Chrome instance or has no command line (likely a zombie process)
-                        if is_our_chrome or not cmdline:
-                            logger.info(f"Terminating process: {proc.info['name']} (PID: {proc.pid})")
-                            try:
-                                proc.kill()
-                                # Wait for process to terminate
-                                gone, alive = psutil.wait_procs([proc], timeout=5)
-                                for p in alive:
-                                    logger.warning(f"Failed to kill process {p.pid}, using SIGKILL")
-                                    os.kill(p.pid, 9)
-                            except psutil.NoSuchProcess:
-                                continue
+                    # Filter on the cheap name field before reading /proc/<pid>/cmdline
+                    name = (proc.info['name'] or '').lower()
+                    if 'chrome' not in name and 'chromium' not in name:
+                        continue
+
+                    if any(arg in profile_flags for arg in proc.cmdline()):
+                        logger.info(f"Terminating process: {proc.info['name']} (PID: {proc.pid})")
+                        targets.append(proc)
                 except (psutil.NoSuchProcess, psutil.AccessDenied, KeyError, Exception) as e:
                     logger.debug(f"Error checking process: {str(e)}")
                     continue
+
+            # Ask the whole batch to exit gracefully so Chrome releases its profile files and pipes
+            alive = self._signal_and_wait(targets, lambda p: p.terminate(), timeout=2)
+            if alive:
+                logger.warning(f"{len(alive)} Chrome process(es) ignored SIGTERM, using SIGKILL")
+                alive = self._signal_and_wait(alive, lambda p: p.kill(), timeout=3)
+                for p in alive:
+                    logger.warning(f"Process {p.pid} still alive after SIGKILL")
+            self._reap_processes(targets)
             logger.info("Chrome process cleanup completed")
         except Exception as e:
             logger.error(f"Error during Chrome process cleanup: {str(e)}")
 
+    def emergency_cleanup(self):
+        """
+        Kill every Chrome process still running on one of our profiles.
+        Only for recovering from drivers that were lost without quit(); normal shutdown of a
+        driver goes through close_driver/cleanup_driver and never touches other drivers.
+        """
+        logger.warning("Running emergency Chrome cleanup")
+        self._kill_chrome_processes()
+
     def _cleanup_existing_chrome_dirs(self):
         """Clean up any existing Chrome user data directories"""
-        self._kill_chrome_processes()
         try:
             temp_root = '/home/site/chrome-data'  # Fixed path for Azure environment
             logger.info(f"Cleaning up Chrome directories in {temp_root}")
             
             if os.path.exists(temp_root):
-                for item in os.listdir(temp_root):
-                    item_path = os.path.join(temp_root, item)
-                    try:
-                        if os.path.isdir(item_path):
-                            shutil.rmtree(item_path, ignore_errors=True)
-                            logger.info(f"Removed directory: {item_path}")
-                        else:
-                            os.remove(item_path)
-                            logger.info(f"Removed file: {item_path}")
-                    except Exception as e:
-                        logger.warning(f"Error removing {item_path}: {str(e)}")
+                # scandir's DirEntry caches the file type, so no extra stat per entry
+                slot_dirs = []
+                stale_dirs = []
+                with os.scandir(temp_root) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False) and entry.name.startswith(SLOT_PROFILE_PREFIX):
+                                slot_dirs.append(entry.path)
+                            elif entry.is_dir(follow_symlinks=False):
+                                stale_dirs.append(entry.path)
+                            else:
+                                os.unlink(entry.path)
+                                logger.info(f"Removed file: {entry.path}")
+                        except Exception as e:
+                            logger.warning(f"Error removing {entry.path}: {str(e)}")
+
+                # A previous process may have left Chrome running on these profiles; it has to be
+                # gone before a slot is unlocked, or two browsers would share one profile
+                self._kill_chrome_processes(slot_dirs + stale_dirs)
+
+                # Pool slot profiles are kept for their warm cache; only clear the locks a crashed
+                # Chrome may have left behind
+                for slot_dir in slot_dirs:
+                    self._clear_profile_locks(slot_dir)
+                self._remove_dirs(stale_dirs)
         except Exception as e:
             logger.error(f"Directory cleanup error: {str(e)}")
+        finally:
+            self._cleanup_done.set()
 
-    def setup_driver(self):
-        """Create new Chrome driver instance with unique user directory"""
-        # Selectively clean up only our Chrome processes
-        self._kill_chrome_processes()
-        
+    def _clear_profile_locks(self, profile_dir):
+        """Remove Chrome's singleton lock files so a reused profile can be opened again"""
+        for name in ('SingletonLock', 'SingletonSocket', 'SingletonCookie'):
+            try:
+                os.unlink(os.path.join(profile_dir, name))
+                logger.info(f"Removed stale {name} from {profile_dir}")
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.warning(f"Error removing {name} from {profile_dir}: {str(e)}")
+
+    def _open_cdp_connection(self, driver):
+        """Open a DevTools WebSocket straight to the driver's page target"""
+        debugger_address = driver.capabilities['goog:chromeOptions']['debuggerAddress']
+        with urllib.request.urlopen(f"http://{debugger_address}/json", timeout=2) as response:
+            targets = [t for t in json.load(response) if t.get('type') == 'page']
+        if not targets:
+            raise Exception("No page target available for CDP connection")
+
+        # chromedriver window handles are the CDP target ids
+        handle = driver.current_window_handle
+        target = next((t for t in targets if t.get('id') == handle), targets[0])
+        conn = websocket.create_connection(target['webSocketDebuggerUrl'], timeout=30, suppress_origin=True)
+        logger.info(f"Opened direct CDP connection to target {target.get('id')}")
+        return conn
+
+    def _close_cdp_connection(self, driver):
+        self._cdp_unavailable.discard(driver)
+        entry = self._cdp_connections.pop(driver, None)
+        if entry:
+            try:
+                entry[0].close()
+            except Exception as e:
+                logger.debug(f"Error closing CDP connection: {str(e)}")
+
+    def _cdp(self, driver, method, params=None):
+        """
+        Send a CDP command directly over the page's DevTools WebSocket.
+        Skips the chromedriver HTTP hop; falls back to execute_cdp_cmd if the socket fails.
+        Args:
+            driver: The WebDriver instance
+            method: CDP method name, e.g. 'Runtime.evaluate'
+            params: Optional dict of CDP parameters
+        Returns:
+            dict: The CDP result payload
+        """
+        params = params or {}
+        # Don't retry /json discovery and the handshake on every call (e.g. inside 100 ms waits)
+        if driver in self._cdp_unavailable:
+            return driver.execute_cdp_cmd(method, params)
+        entry = self._cdp_connections.get(driver)
+        if entry is None:
+            try:
+                entry = (self._open_cdp_connection(driver), itertools.count(1))
+            except Exception as e:
+                logger.debug(f"Could not open direct CDP connection for {method}, using chromedriver: {str(e)}")
+                self._cdp_unavailable.add(driver)
+                return driver.execute_cdp_cmd(method, params)
+            self._cdp_connections[driver] = entry
+        conn, ids = entry
+
+        try:
+            message_id = next(ids)
+            conn.send(json.dumps({'id': message_id, 'method': method, 'params': params}))
+            while True:
+                message = json.loads(conn.recv())
+                if message.get('id') == message_id:
+                    break
+        except (websocket.WebSocketException, OSError) as e:
+            # Only a broken socket is worth reconnecting for
+            logger.debug(f"Direct CDP call {method} failed, using chromedriver: {str(e)}")
+            self._close_cdp_connection(driver)
+            return driver.execute_cdp_cmd(method, params)
+
+        # A protocol error is Chrome's answer to the command; resending it through chromedriver
+        # would fail the same way, so surface it and keep the healthy socket open
+        if 'error' in message:
+            raise Exception(f"CDP {method} failed: {message['error'].get('message')}")
+        return message.get('result', {})
+
+    def evaluate(self, driver, expression):
+        """Evaluate a JavaScript expression in the page via CDP and return its value"""
+        result = self._cdp(driver, 'Runtime.evaluate', {'expression': expression, 'returnByValue': True})
+        if 'exceptionDetails' in result:
+            raise Exception(f"Script evaluation failed: {result['exceptionDetails'].get('text')}")
+        return result.get('result', {}).get('value')
+
+    def _get_driver_path(self):
+        """Resolve the chromedriver binary once per process; pool workers may race on first use"""
+        if DriverService._driver_path is None:
+            with DriverService._driver_path_lock:
+                if DriverService._driver_path is None:
+                    DriverService._driver_path = ChromeDriverManager().install()
+                    logger.info(f"Resolved chromedriver path: {DriverService._driver_path}")
+        return DriverService._driver_path
+
+    def _get_free_port(self):
+        """Ask the OS for an unused localhost port; Chrome binds it right after, so the reuse window is tiny"""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    def _is_headless(self):
+        """In Azure, always run headless. Locally, make it configurable"""
+        return bool(os.getenv('WEBSITE_HOSTNAME')) or os.getenv('RUN_HEADLESS', 'false').lower() == 'true'
+
+    def setup_driver(self, warm=False, slot=None):
+        """
+        Create new Chrome driver instance with its own user directory.
+        Args:
+            warm: Preload the Twitter login page; useful when the driver is parked in a pool
+                  rather than used (and navigated by login()) right away
+            slot: Pool slot index; pooled drivers reuse a stable per-slot profile so Chrome's
+                  disk cache and preferences survive driver restarts. None uses a throwaway profile.
+        """
         chrome_options = webdriver.ChromeOptions()
         logger.info("Setting up Chrome options")
         
         # Configure Chrome user directory - use different paths for local vs Azure
         if os.getenv('WEBSITE_HOSTNAME'):  # Running in Azure
             base_dir = '/home/site/chrome-data'
+            # Startup cleanup wipes this directory, so wait for it before creating a profile here
+            self._cleanup_done.wait()
         else:  # Running locally
             # Use a directory in the user's temp folder to avoid conflicts
             base_dir = os.path.join(tempfile.gettempdir(), 'timehealer-chrome-data')
             
-        logging.info(f"Using Chrome profile base directory: {base_dir}")
+        logger.info("Using Chrome profile base directory: %s", base_dir)
         os.makedirs(base_dir, exist_ok=True)
         
-        # Create a unique profile directory for this session
-        temp_dir = os.path.join(base_dir, f'profile_{uuid.uuid4()}')  # Unique UUID-based directory
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        # Set directory permissions
+        if slot is not None:
+            # Reuse the slot's profile; a previous Chrome in this slot may have died holding its locks
+            temp_dir = os.path.join(base_dir, f'{SLOT_PROFILE_PREFIX}{slot}')
+            os.makedirs(temp_dir, exist_ok=True)
+            self._clear_profile_locks(temp_dir)
+        else:
+            # Create a unique profile directory for this session
+            temp_dir = os.path.join(base_dir, f'profile_{uuid.uuid4()}')  # Unique UUID-based directory
+            os.makedirs(temp_dir, exist_ok=True)
+
+        # Chrome profiles must be writable by the Chrome user on Azure. Only the profile directory
+        # is opened up; the process umask stays as is, so files Chrome creates inside keep it
         try:
             os.chmod(temp_dir, 0o777)
-            logger.info(f"Set permissions for directory: {temp_dir}")
         except Exception as e:
             logger.error(f"Error setting directory permissions: {str(e)}")
 
@@ -133,24 +472,25 @@ class DriverService:
         chrome_options.add_argument('--disable-background-networking')
         
         # Set a realistic user agent for Windows 10 and latest Chrome
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36')
+        chrome_options.add_argument(f'user-agent={USER_AGENT}')
 
         # Chrome configuration
         chrome_options.add_argument(f'--user-data-dir={temp_dir}')
         
-        # Use a random debugging port to avoid conflicts with user's Chrome
-        import random
-        debug_port = random.randint(9222, 9999)
+        # Let the OS pick a free debugging port so concurrently warmed drivers can't collide
+        debug_port = self._get_free_port()
         chrome_options.add_argument(f'--remote-debugging-port={debug_port}')
         
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-gpu')
         chrome_options.add_argument('--window-size=1920,1080')
+        # Twitter serves media as pbs.twimg.com/...?format=jpg, which the extension-based URL
+        # blocking misses; tweets are read for text and links only, so skip images entirely
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
         
         # Determine if we should run headless based on environment
-        # In Azure, always run headless. Locally, make it configurable
-        if os.getenv('WEBSITE_HOSTNAME') or os.getenv('RUN_HEADLESS', 'false').lower() == 'true':
+        if self._is_headless():
             chrome_options.add_argument('--headless=new')
             logger.info("Running Chrome in headless mode")
         else:
@@ -160,21 +500,39 @@ class DriverService:
         chrome_options.add_argument('--hide-scrollbars')
         chrome_options.add_argument('--force-device-scale-factor=1')
         
-        # Set up logging directory
-        log_dir = os.path.join(os.getcwd(), 'logs', 'chrome')
-        os.makedirs(log_dir, exist_ok=True)
-        chrome_options.add_argument('--enable-logging')  # Enables Chrome's internal logging
-        chrome_options.add_argument('--v=1')  # Verbose logging level
-        chrome_options.add_argument(f'--log-path={os.path.join(log_dir, "chromedriver.log")}')
+        # Verbose Chrome logging writes to disk on every page action (and /home/site is a network
+        # share on Azure), so it is opt-in for debugging only
+        if os.getenv('CHROME_VERBOSE_LOG', 'false').lower() == 'true':
+            log_dir = os.path.join(os.getcwd(), 'logs', 'chrome')
+            os.makedirs(log_dir, exist_ok=True)
+            chrome_options.add_argument('--enable-logging')  # Enables Chrome's internal logging
+            chrome_options.add_argument('--v=1')  # Verbose logging level
+            chrome_options.add_argument(f'--log-path={os.path.join(log_dir, "chromedriver.log")}')
         
         # Additional options to make the browser appear more realistic
         chrome_options.add_argument('--disable-notifications')
         chrome_options.add_argument('--lang=en-US,en')
         chrome_options.add_argument('--start-maximized')
 
+        # Return from get() as soon as navigation starts; callers wait on the elements they need
+        # instead of blocking until every subresource has loaded (see navigate())
+        chrome_options.page_load_strategy = 'none'
+
+        driver = None
         try:
-            service = Service(ChromeDriverManager().install())
+            # Start chromedriver in its own session so it and the Chrome it launches can be
+            # signalled as a process group instead of scanning every process on the machine
+            popen_kw = {'start_new_session': True} if os.name == 'posix' else {}
+            service = Service(self._get_driver_path(), popen_kw=popen_kw)
             driver = webdriver.Chrome(service=service, options=chrome_options)
+            self._track_process_groups(driver, service)
+
+            # Pay Chrome's cold-start cost (proxy config lookup, background fetches) on a blank
+            # page so the first real navigation runs against a warmed network stack
+            driver.get("about:blank")
+            WebDriverWait(driver, 5).until(
+                lambda d: d.execute_script('return document.readyState') == 'complete'
+            )
             
             # Set shorter page load timeout to prevent hanging
             driver.set_page_load_timeout(30)
@@ -184,43 +542,78 @@ class DriverService:
             
             # Execute CDP commands to prevent detection
             driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-                "userAgent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
+                "userAgent": USER_AGENT
             })
+
+            # Register the anti-detection patches once; Chrome re-applies them on every navigation.
+            # This goes through chromedriver's own CDP session so it lives as long as the driver.
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': ANTI_DETECT_JS})
+
+            # Skip downloading images, video and fonts on every page
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': _BLOCKED_URL_PATTERNS})
             
             # Preload Twitter login page to warm up the browser
-            try:
-                driver.get("https://x.com/i/flow/login")
-                logger.info("Preloaded Twitter login page")
-            except Exception as e:
-                logger.warning(f"Error preloading Twitter login page: {str(e)}")
-            
-            # Execute JavaScript to prevent detection
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            if warm:
+                try:
+                    driver.get("https://x.com/i/flow/login")
+                    logger.info("Preloaded Twitter login page")
+                except Exception as e:
+                    logger.warning(f"Error preloading Twitter login page: {str(e)}")
             
             self.active_drivers.add(driver)
+            self._driver_to_tempdir[driver] = temp_dir
             logger.info("Chrome driver initialized successfully")
             return driver
         except Exception as e:
             logger.error(f"Driver initialization failed: {str(e)}")
-            # Cleanup failed instance
-            try:
-                shutil.rmtree(temp_dir, ignore_errors=True)
-                self.temp_dirs.discard(temp_dir)
-                logger.info(f"Cleaned up failed driver directory: {temp_dir}")
-            except Exception as cleanup_error:
-                logger.error(f"Directory cleanup error: {str(cleanup_error)}")
+            # Chrome may already be running if a post-launch step failed; stop it before anything
+            # else touches its profile
+            if driver is not None:
+                self._quit_driver(driver)
+            # Cleanup failed instance; a slot profile is kept for the slot's next driver
+            if slot is None:
+                try:
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+                    self.temp_dirs.discard(temp_dir)
+                    logger.info(f"Cleaned up failed driver directory: {temp_dir}")
+                except Exception as cleanup_error:
+                    logger.error(f"Directory cleanup error: {str(cleanup_error)}")
             raise
 
+    def navigate(self, driver, url, timeout=10):
+        """
+        Load a URL and wait until the previous document has been replaced.
+        With pageLoadStrategy 'none' get() returns immediately, so without this a following
+        element wait could match the page we are navigating away from.
+        Args:
+            driver: The WebDriver instance
+            url: The URL to load
+            timeout: Seconds to wait for the new document
+        """
+        try:
+            old_document = driver.find_element(By.TAG_NAME, 'html')
+        except Exception:
+            old_document = None
+        driver.get(url)
+        if old_document is not None:
+            try:
+                WebDriverWait(driver, timeout, poll_frequency=0.1).until(EC.staleness_of(old_document))
+            except TimeoutException:
+                logger.warning(f"Timed out waiting for navigation to {url}")
+
     def login(self, driver):
         username = os.getenv('TWITTER_USERNAME')
         password = os.getenv('TWITTER_PASSWORD')
-        logging.info(f"Logging in with username: {username} and password: {password}")
+        # Never log the password; username only, and only at DEBUG
+        logger.debug("Logging in with username: %s", username)
+        headless = self._is_headless()
         
         try:
             # Check if we're already on the login page, if not navigate to it
             if "login" not in driver.current_url.lower():
                 logger.info("Navigating to login page")
-                driver.get("https://x.com/i/flow/login")
+                self.navigate(driver, "https://x.com/i/flow/login")
                 
             # Wait for page to be ready
             WebDriverWait(driver, 10).until(
@@ -232,64 +625,161 @@ class DriverService:
             if not username_input:
                 raise Exception("Could not find username input field")
                 
-            username_input.clear()
-            username_input.send_keys(username)
-            print("username entered")
-            logging.info("username entered")
-            
-            # Click next with retry
-            self.click_next_button(driver)
-            print("next button clicked")
-            logging.info("next button clicked")
+            # In headless mode fill the field and click Next in a single script; nobody is watching
+            # the typing, so the per-keystroke send_keys round-trips buy nothing
+            if headless and self._fill_and_next(driver, username_input, username):
+                logger.info("username entered and next button clicked via script")
+            else:
+                username_input.clear()
+                username_input.send_keys(username)
+                print("username entered")
+                logger.info("username entered")
+                
+                # Click next with retry
+                self.click_next_button(driver)
+                print("next button clicked")
+                logger.info("next button clicked")
             
             # Handle optional verification step
             self.handle_optional_step(driver)
             print("optional step handled")
-            logging.info("optional step handled")
+            logger.info("optional step handled")
             
             # Find password field with improved strategy
             password_input = self.find_password_input(driver)
             if not password_input:
                 raise Exception("Could not find password input field")
                 
-            password_input.clear()
-            password_input.send_keys(password)
-            print("password entered")
-            
-            # Click login button with retry
-            self.click_login_button(driver)
-            print("login button clicked")
+            if headless and self._fill_password_and_submit(driver, password_input, password):
+                logger.info("password entered and login button clicked via script")
+            else:
+                password_input.clear()
+                password_input.send_keys(password)
+                print("password entered")
+                
+                # Click login button with retry
+                self.click_login_button(driver)
+                print("login button clicked")
             
-            # Wait briefly for login to process
-            time.sleep(2)
+            # Wait for the login to navigate away from the login flow instead of sleeping blindly
+            try:
+                WebDriverWait(driver, 5).until(lambda d: "login" not in d.current_url.lower())
+            except TimeoutException:
+                logger.warning("Still on login page after submitting credentials")
             
         except Exception as e:
             logger.error(f"Login failed: {str(e)}")
             raise Exception(f"Login failed: {str(e)}")
 
+    def _find_first(self, driver, selectors, timeout=3, root=None, require_enabled=True):
+        """
+        Wait for the first visible, enabled element matching any of the selectors.
+        Every poll checks the whole list in a single execute_script instead of one
+        WebDriver command per selector.
+        Args:
+            driver: The WebDriver instance
+            selectors: Sequence of (By, selector) tuples; CSS and XPath are supported
+            timeout: Seconds to keep polling
+            root: Optional WebElement to search within
+            require_enabled: Set to False to also match disabled elements
+        Returns:
+            WebElement: The first match; raises TimeoutException if none appear
+        """
+        selector_list = [[by, selector] for by, selector in selectors]
+        return WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: d.execute_script(_FIND_FIRST_JS, selector_list, root, require_enabled)
+        )
+
+    def save_cookies(self, driver):
+        """Persist the current session cookies so later drivers (or a restarted app) can reuse the login"""
+        try:
+            cookies = driver.get_cookies()
+            # The cookies are as good as the password, so keep the directory and file private
+            os.makedirs(os.path.dirname(COOKIE_FILE), mode=0o700, exist_ok=True)
+            with self._cookie_lock:
+                tmp_path = f'{COOKIE_FILE}.tmp'
+                # Drop any leftover temp file, then create it exclusively so a planted file or
+                # symlink at that path can't redirect the write
+                try:
+                    os.unlink(tmp_path)
+                except FileNotFoundError:
+                    pass
+                fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(cookies, f)
+                os.replace(tmp_path, COOKIE_FILE)
+            logger.info(f"Saved {len(cookies)} session cookies")
+        except Exception as e:
+            logger.warning(f"Could not save session cookies: {str(e)}")
+
+    def has_session_cookie(self, driver, url="https://x.com"):
+        """
+        Check whether the browser holds Twitter's auth_token cookie for url.
+        Asks CDP for the url's cookies, so it works whatever page the driver is currently on.
+        """
+        try:
+            cookies = self._cdp(driver, 'Network.getCookies', {'urls': [url]}).get('cookies', [])
+        except Exception as e:
+            logger.debug(f"Could not read session cookies: {str(e)}")
+            return False
+        return any(cookie.get('name') == 'auth_token' for cookie in cookies)
+
+    def load_cookies(self, driver):
+        """
+        Restore saved session cookies into the browser.
+        Uses CDP so the cookies can be set without first navigating to the cookie's domain.
+        Returns:
+            bool: True if any cookies were restored
+        """
+        try:
+            with self._cookie_lock:
+                with open(COOKIE_FILE) as f:
+                    saved = json.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Could not read saved session cookies: {str(e)}")
+            return False
+
+        cookies = []
+        for cookie in saved:
+            param = {k: cookie[k] for k in _COOKIE_FIELDS if k in cookie}
+            if 'expiry' in cookie:
+                param['expires'] = cookie['expiry']
+            cookies.append(param)
+        if not cookies:
+            return False
+        try:
+            driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+            logger.info(f"Restored {len(cookies)} session cookies")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not restore session cookies: {str(e)}")
+            return False
+
+    def _fill_and_click(self, driver, input_element, value, button_test_id, button_text):
+        """Fill an input the way React expects and click the matching button in one round-trip"""
+        try:
+            return bool(driver.execute_script(_FILL_AND_CLICK_JS, input_element, value, button_test_id, button_text))
+        except Exception as e:
+            logger.debug(f"Scripted fill for '{button_text}' failed, falling back: {str(e)}")
+            return False
+
+    def _fill_and_next(self, driver, input_element, value):
+        return self._fill_and_click(driver, input_element, value, None, 'Next')
+
+    def _fill_password_and_submit(self, driver, input_element, value):
+        return self._fill_and_click(driver, input_element, value, 'LoginForm_Login_Button', 'Log in')
+
     def find_username_element(self, driver):
         logger.info("Finding username input field...")
-        selectors = [
-            (By.CSS_SELECTOR, "input[name='text'][autocomplete='username']"),
-            (By.CSS_SELECTOR, "input.r-30o5oe.r-1dz5y72.r-13qz1uu"),
-            (By.XPATH, "//input[@autocapitalize='sentences' and @autocomplete='username']"),
-            (By.CSS_SELECTOR, "input[type='text'][dir='auto']"),
-            (By.CSS_SELECTOR, "input[data-testid='ocfEnterTextTextInput']"),
-            (By.CSS_SELECTOR, "input[autocomplete='username']"),
-            (By.CSS_SELECTOR, "input[type='text']")
-        ]
-        
-        # Try each selector with a short timeout
-        for by, selector in selectors:
-            try:
-                logger.info(f"Trying username selector: {selector}")
-                element = WebDriverWait(driver, 3).until(EC.presence_of_element_located((by, selector)))
-                # Ensure element is visible and interactable
-                if element.is_displayed() and element.is_enabled():
-                    logger.info(f"Username input found with selector: {selector}")
-                    return element
-            except Exception:
-                continue
+        # Check every selector in one script per poll
+        try:
+            element = self._find_first(driver, _USERNAME_SELECTORS)
+            logger.info("Username input found")
+            return element
+        except TimeoutException:
+            logger.warning("No username selector matched a visible input")
                 
         # If all quick attempts fail, try one more time with a longer timeout
         try:
@@ -315,34 +805,14 @@ class DriverService:
             logger.warning("Login form not found, searching in entire page")
             form_context = driver
             
-        selectors = [
-            (By.CSS_SELECTOR, "input[name='password'][type='password']"),
-            (By.CSS_SELECTOR, "input[autocomplete='current-password']"),
-            (By.XPATH, "//input[@type='password' and contains(@class, 'r-30o5oe')]"),
-            (By.CSS_SELECTOR, "input[type='password']"),
-            (By.CSS_SELECTOR, "[data-testid='password-field']"),
-            (By.XPATH, "//input[contains(@class, 'password-field')]"),
-            (By.XPATH, "//div[contains(@class, 'LoginForm')]//input[@type='password']")
-        ]
-        
-        # Try each selector with a short timeout first
-        for by, selector in selectors:
-            try:
-                logger.info(f"Trying password selector: {selector}")
-                if form_context == driver:
-                    element = WebDriverWait(driver, 3).until(
-                        EC.presence_of_element_located((by, selector))
-                    )
-                else:
-                    # Search within the form if we found it
-                    element = form_context.find_element(by, selector)
-                    
-                # Ensure element is visible and interactable
-                if element.is_displayed() and element.is_enabled():
-                    logger.info(f"Password input found with selector: {selector}")
-                    return element
-            except Exception:
-                continue
+        # Check every selector in one script per poll, scoped to the form if we found it
+        try:
+            root = form_context if form_context != driver else None
+            element = self._find_first(driver, _PASSWORD_SELECTORS, root=root)
+            logger.info("Password input found")
+            return element
+        except TimeoutException:
+            logger.warning("No password selector matched a visible input")
                 
         # If all quick attempts fail, try one more time with a longer timeout
         try:
@@ -355,17 +825,11 @@ class DriverService:
             return None
 
     def click_next_button(self, driver):
-        next_button_selectors = [
-            (By.XPATH, "//button[@role='button']//span[contains(text(), 'Next')]"),
-            (By.XPATH, "//div[@role='button']//span[contains(text(), 'Next')]"),
-            (By.XPATH, "//*[contains(text(), 'Next')][@role='button']"),
-            (By.XPATH, "//button[.//span[contains(text(), 'Next')]]")
-        ]
-        
-        for by, selector in next_button_selectors:
+        wait = WebDriverWait(driver, 3, poll_frequency=0.1)
+        for by, selector in _NEXT_SELECTORS:
             try:
                 logger.info(f"Trying next button selector: {selector}")
-                next_button = WebDriverWait(driver, 3).until(
+                next_button = wait.until(
                     EC.element_to_be_clickable((by, selector))
                 )
                 
@@ -395,38 +859,29 @@ class DriverService:
             raise Exception("Next button not found or not clickable")
 
     def click_login_button(self, driver):
-        login_button_selectors = [
-            (By.CSS_SELECTOR, "[data-testid='LoginForm_Login_Button']"),
-            (By.XPATH, "//button[@role='button']//span[contains(text(), 'Log in')]"),
-            (By.XPATH, "//div[@role='button' and contains(., 'Log in')]"),
-            (By.XPATH, "//button[contains(., 'Log in')]")
-        ]
-        
-        for by, selector in login_button_selectors:
-            try:
-                logger.info(f"Trying login button selector: {selector}")
-                login_button = WebDriverWait(driver, 3).until(
-                    EC.element_to_be_clickable((by, selector))
+        try:
+            # Match the button even while it is disabled, so we wait on it below instead of
+            # dropping to the generic fallback
+            login_button = self._find_first(driver, _LOGIN_SELECTORS, require_enabled=False)
+            
+            # Check if the button is disabled
+            if login_button.get_attribute("disabled"):
+                logger.warning("Login button is disabled. Waiting for it to become enabled...")
+                WebDriverWait(driver, 5).until_not(
+                    lambda d: login_button.get_attribute("disabled")
                 )
-                
-                # Check if the button is disabled
-                if login_button.get_attribute("disabled"):
-                    logger.warning("Login button is disabled. Waiting for it to become enabled...")
-                    WebDriverWait(driver, 5).until_not(
-                        lambda d: login_button.get_attribute("disabled")
-                    )
-                
-                # Try regular click first
-                try:
-                    login_button.click()
-                except Exception:
-                    # If regular click fails, try JavaScript click
-                    driver.execute_script("arguments[0].click();", login_button)
-                    
-                logger.info("Login button clicked successfully")
-                return True
+            
+            # Try regular click first
+            try:
+                login_button.click()
             except Exception:
-                continue
+                # If regular click fails, try JavaScript click
+                driver.execute_script("arguments[0].click();", login_button)
+                
+            logger.info("Login button clicked successfully")
+            return True
+        except Exception as e:
+            logger.warning(f"Login button selectors failed: {str(e)}")
                 
         # If all quick attempts fail, try one more time with a longer timeout
         try:
@@ -441,17 +896,62 @@ class DriverService:
             logger.error(f"Login button not found or not clickable: {str(e)}")
             raise Exception("Login button not found or not clickable")
 
+    def _wait_for_selector_fast(self, driver, locator, timeout_ms):
+        """
+        Wait for an element using a MutationObserver inside the page, so we return within one
+        event-loop tick of the element being inserted instead of on the next WebDriverWait poll.
+        Args:
+            driver: The WebDriver instance
+            locator: (By, selector) tuple; CSS and XPath are supported
+            timeout_ms: Milliseconds to wait before giving up
+        Returns:
+            bool: True if the element appeared within the timeout
+        """
+        by, selector = locator
+        if by == By.XPATH:
+            query = f"document.evaluate({json.dumps(selector)}, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue"
+        else:
+            query = f"document.querySelector({json.dumps(selector)})"
+        expression = f"""
+            new Promise(resolve => {{
+                const q = () => {query};
+                if (q()) return resolve(true);
+                const observer = new MutationObserver(() => {{
+                    if (q()) {{ observer.disconnect(); resolve(true); }}
+                }});
+                observer.observe(document, {{childList: true, subtree: true, characterData: true}});
+                setTimeout(() => {{ observer.disconnect(); resolve(false); }}, {int(timeout_ms)});
+            }})
+        """
+        try:
+            result = driver.execute_cdp_cmd('Runtime.evaluate', {
+                'expression': expression,
+                'awaitPromise': True,
+                'returnByValue': True
+            })
+            return bool(result.get('result', {}).get('value'))
+        except Exception as e:
+            # e.g. the page navigated and destroyed the execution context; fall back to polling
+            logger.debug(f"MutationObserver wait failed, falling back to polling: {str(e)}")
+            try:
+                WebDriverWait(driver, timeout_ms / 1000, poll_frequency=0.1).until(
+                    EC.presence_of_element_located(locator)
+                )
+                return True
+            except TimeoutException:
+                return False
+
     def handle_optional_step(self,driver):
         optional_step_text = "Enter your phone number or username"
         phone_number = os.getenv('TWITTER_PHONE_NUMBER')
         try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, f"//span[contains(text(), '{optional_step_text}')]"))
-            )
+            if not self._wait_for_selector_fast(driver, (By.XPATH, f"//span[contains(text(), '{optional_step_text}')]"), 10000):
+                raise TimeoutException("Optional step text not found")
             logger.info("Optional step detected")
-            optional_input = WebDriverWait(driver, 3).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "input[data-testid='ocfEnterTextTextInput']"))
-            )
+            input_locator = (By.CSS_SELECTOR, "input[data-testid='ocfEnterTextTextInput']")
+            if not self._wait_for_selector_fast(driver, input_locator, 3000):
+                raise TimeoutException("Optional step input not found")
+            optional_input = driver.find_element(*input_locator)
             optional_input.send_keys(phone_number)
             logger.info("phone_number entered in optional step")
             self.click_next_button(driver)
@@ -461,11 +961,14 @@ class DriverService:
     
             
     def scroll_page(self, driver, scroll_pause_time=1):
-        last_height = driver.execute_script("return document.body.scrollHeight")
+        # Measure and scroll in one round-trip per iteration; the measurement taken after each
+        # pause tells us whether the previous scroll loaded more content
+        scroll_and_measure = "window.scrollTo(0, document.body.scrollHeight); document.body.scrollHeight"
+        last_height = self.evaluate(driver, scroll_and_measure)
         while True:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            WebDriverWait(driver, scroll_pause_time).until(lambda d: d.execute_script("return document.readyState") == "complete")
-            new_height = driver.execute_script("return document.body.scrollHeight")
+            # readyState stays 'complete' during infinite scroll, so polling it never waited; just pause
+            time.sleep(scroll_pause_time)
+            new_height = self.evaluate(driver, scroll_and_measure)
             if new_height == last_height:
                 break
             last_height = new_height
@@ -489,14 +992,18 @@ class DriverService:
             
             # Generate filename
             timestamp = time.strftime("%Y%m%d-%H%M%S")
-            filename = f"{name}_{timestamp}.png" if name else f"screenshot_{timestamp}.png"
+            filename = f"{name}_{timestamp}.jpg" if name else f"screenshot_{timestamp}.jpg"
             filepath = os.path.join(screenshots_dir, filename)
             
-            # Set window size to ensure full page is captured
-            driver.set_window_size(1920, 1080)
-            
-            # Take screenshot
-            driver.save_screenshot(filepath)
+            # The window is already 1920x1080 from the launch flags, so capture the viewport as it is.
+            # JPEG is much smaller and cheaper to encode than PNG for debug screenshots
+            data = self._cdp(driver, 'Page.captureScreenshot', {
+                'format': 'jpeg',
+                'quality': 70,
+                'captureBeyondViewport': False
+            })['data']
+            with open(filepath, 'wb') as f:
+                f.write(base64.b64decode(data))
             logger.info(f"Screenshot saved to: {filepath}")
             
             # Set permissions for the file
@@ -516,19 +1023,9 @@ class DriverService:
         try:
             # Remove from active drivers set
             self.active_drivers.discard(driver)
+            self._close_cdp_connection(driver)
             
-            # Get the user data directory before closing
-            user_data_dir = None
-            try:
-                command_line = driver.execute_script(
-                    "return window.navigator.userAgent;"
-                )
-                for temp_dir in self.temp_dirs:
-                    if temp_dir in str(command_line):
-                        user_data_dir = temp_dir
-                        break
-            except Exception as e:
-                logger.debug(f"Could not retrieve user data directory: {str(e)}")
+            user_data_dir = self._driver_to_tempdir.pop(driver, None)
             
             # Close the driver
             try:
@@ -543,9 +1040,13 @@ class DriverService:
                 logger.info("Driver quit successfully")
             except Exception as e:
                 logger.warning(f"Error quitting driver: {str(e)}")
+
+            # Make sure Chrome and its renderers are gone, without scanning every process
+            self._kill_process_groups(driver)
             
-            # Clean up the specific user data directory
-            if user_data_dir and os.path.exists(user_data_dir):
+            # Clean up the specific user data directory. Pool slot profiles are kept so the
+            # replacement driver can reuse them; they are removed at shutdown instead
+            if user_data_dir and not self._is_slot_dir(user_data_dir) and os.path.exists(user_data_dir):
                 try:
                     shutil.rmtree(user_data_dir, ignore_errors=True)
                     self.temp_dirs.discard(user_data_dir)
@@ -555,35 +1056,177 @@ class DriverService:
         except Exception as e:
             logger.error(f"Error during driver cleanup: {str(e)}")
 
+    def _track_process_groups(self, driver, service):
+        """Remember the process groups of chromedriver and the Chrome browser it launched"""
+        if os.name != 'posix':
+            return
+        try:
+            driver_proc = psutil.Process(service.process.pid)
+            pgids = set()
+            for proc in [driver_proc] + driver_proc.children():
+                try:
+                    pgids.add(os.getpgid(proc.pid))
+                except ProcessLookupError:
+                    continue
+            # Never signal our own group, e.g. if the new session could not be created
+            pgids.discard(os.getpgrp())
+            self._driver_pgids[driver] = pgids
+        except Exception as e:
+            logger.debug(f"Could not determine Chrome process groups: {str(e)}")
+
+    def _kill_process_groups(self, driver, timeout=2):
+        """SIGTERM the driver's process groups, then SIGKILL any that outlive the timeout"""
+        self._stop_process_groups(self._driver_pgids.pop(driver, set()), timeout=timeout)
+
+    def _signal_groups(self, pgids, sig):
+        """Signal each process group; returns the groups that still existed"""
+        signalled = set()
+        for pgid in pgids:
+            try:
+                os.killpg(pgid, sig)
+                signalled.add(pgid)
+            except OSError:
+                continue
+        return signalled
+
+    def _group_members(self, pgids):
+        """Find the Chrome/chromedriver processes in the given groups, filtering on name before getpgid"""
+        members = []
+        for proc in psutil.process_iter(['name']):
+            try:
+                name = (proc.info['name'] or '').lower()
+                if 'chrome' not in name and 'chromium' not in name:
+                    continue
+                if os.getpgid(proc.pid) in pgids:
+                    members.append(proc)
+            except (psutil.NoSuchProcess, OSError):
+                continue
+        return members
+
+    def _stop_process_groups(self, pgids, timeout=2):
+        """
+        Stop a batch of process groups: killpg reaches every member, including ones forked
+        after we looked, and the process scan is only used to wait on pidfds for the groups
+        that actually still exist.
+        Args:
+            pgids: Process group ids to stop
+            timeout: Seconds to wait after SIGTERM before escalating to SIGKILL
+        """
+        live = self._signal_groups(pgids, signal.SIGTERM)
+        if not live:
+            return
+
+        # killpg(pgid, 0) keeps succeeding while a member is a zombie, so wait on the members'
+        # pidfds instead of polling the group
+        members = self._group_members(live)
+        alive = self._signal_and_wait(members, None, timeout=timeout)
+        if alive:
+            stubborn = set()
+            for p in alive:
+                try:
+                    stubborn.add(os.getpgid(p.pid))
+                except OSError:
+                    continue
+            logger.warning(f"{len(alive)} process(es) in group(s) {sorted(stubborn)} ignored SIGTERM, using SIGKILL")
+            self._signal_groups(stubborn, signal.SIGKILL)
+            for p in self._signal_and_wait(alive, None, timeout=3):
+                logger.warning(f"Process {p.pid} still alive after SIGKILL")
+        self._reap_processes(members)
+
+    def _quit_driver(self, driver, stop_groups=True):
+        """
+        Quit a driver, drop its CDP connection and stop its process groups.
+        Args:
+            driver: The WebDriver instance
+            stop_groups: False when the caller stops the process groups itself in one batch
+        """
+        try:
+            driver.quit()
+            logger.info("Driver quit successfully")
+        except Exception as e:
+            logger.error(f"Error quitting driver: {str(e)}")
+        finally:
+            self._close_cdp_connection(driver)
+            if stop_groups:
+                self._kill_process_groups(driver)
+            self.active_drivers.discard(driver)
+            self._driver_to_tempdir.pop(driver, None)
+
+    def _remove_dir(self, path):
+        try:
+            shutil.rmtree(path, ignore_errors=True)
+            logger.info(f"Removed directory: {path}")
+            return True
+        except Exception as e:
+            logger.error(f"Error removing directory {path}: {str(e)}")
+            return False
+
+    def _remove_dirs(self, paths):
+        """
+        Remove directory trees in parallel. Chrome profiles hold thousands of cache files and
+        unlink() releases the GIL, so the trees are deleted concurrently rather than one by one.
+        Returns:
+            list: Paths that were removed
+        """
+        paths = list(paths)
+        if not paths:
+            return []
+        with ThreadPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 4)) as executor:
+            results = list(executor.map(self._remove_dir, paths))
+        return [path for path, removed in zip(paths, results) if removed]
+
+    def _remove_temp_dirs(self):
+        """Remove every Chrome profile directory created by this service"""
+        for temp_dir in self._remove_dirs(self.temp_dirs):
+            self.temp_dirs.discard(temp_dir)
+
+    def _is_slot_dir(self, path):
+        return os.path.basename(path).startswith(SLOT_PROFILE_PREFIX)
+
     def cleanup_driver(self, driver):
         """Safely cleanup a specific driver instance"""
         if driver:
+            # Look the profile up before _quit_driver forgets it; other drivers' profiles, and
+            # this driver's slot profile, stay in place
+            user_data_dir = self._driver_to_tempdir.get(driver)
             try:
-                driver.quit()
-                logger.info("Driver quit successfully")
-            except Exception as e:
-                logger.error(f"Error quitting driver: {str(e)}")
+                self._quit_driver(driver)
             finally:
-                self._kill_chrome_processes()
-                self.active_drivers.discard(driver)
-                
-                # Cleanup associated directories
-                for temp_dir in list(self.temp_dirs):
-                    try:
-                        shutil.rmtree(temp_dir, ignore_errors=True)
-                        self.temp_dirs.discard(temp_dir)
-                        logger.info(f"Cleaned up directory: {temp_dir}")
-                    except Exception as e:
-                        logger.error(f"Directory cleanup error: {str(e)}")
+                if user_data_dir and not self._is_slot_dir(user_data_dir):
+                    if self._remove_dir(user_data_dir):
+                        self.temp_dirs.discard(user_data_dir)
 
     def cleanup_all_drivers(self):
         """Cleanup all driver instances"""
         logger.info("Cleaning up all drivers")
-        for driver in list(self.active_drivers):
-            self.cleanup_driver(driver)
+        drivers = list(self.active_drivers)
+        if not drivers:
+            return
+
+        # Take every driver's process groups up front so they are stopped in one batch with a
+        # single process scan, instead of one scan per driver
+        pgids = set()
+        for driver in drivers:
+            pgids |= self._driver_pgids.pop(driver, set())
+
+        # quit() only waits on the chromedriver socket, so all drivers can quit in parallel
+        with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+            list(executor.map(lambda d: self._quit_driver(d, stop_groups=False), drivers))
         self.active_drivers.clear()
+        self._stop_process_groups(pgids)
+
+        # A single directory pass covers every driver
+        self._remove_temp_dirs()
 
     def check_login_status(self,driver):
+        # Still on the login flow (or bounced back to it): no point waiting for the search box
+        try:
+            url = driver.current_url.lower()
+        except Exception:
+            return False
+        if 'login' in url or 'flow' in url:
+            return False
+
         search_input_selector = "[data-testid='SearchBox_Search_Input']"
         try:
             search_input = WebDriverWait(driver, 5).until(
@@ -591,78 +1234,4 @@ class DriverService:
             )
             return True
         except TimeoutException:
-            return False
-
-    def click_latest_button(self, driver):
-        """Click the 'Latest' button on Twitter search results to get the most recent tweets"""
-        logger.info("Attempting to click 'Latest' button")
-        try:
-            # Wait for search results to load
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="primaryColumn"]'))
-            )
-            
-            # Try multiple selectors for the Latest tab
-            latest_button_selectors = [
-                '[data-testid="tab-latest"]',
-                '[role="tab"][aria-selected="false"]:nth-child(2)',
-                'a[href*="f=live"]',
-                'span:contains("Latest")',
-                '[data-testid="ScrollSnap-List"] div:nth-child(2)'
-            ]
-            
-            # Try each selector
-            for selector in latest_button_selectors:
-                try:
-                    # First check if element exists
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        # Try to click the first one
-                        elements[0].click()
-                        logger.info(f"Clicked 'Latest' button using selector: {selector}")
-                        # Wait for content to update
-                        time.sleep(2)
-                        return True
-                except Exception as e:
-                    logger.debug(f"Failed to click using selector {selector}: {str(e)}")
-            
-            # If CSS selectors fail, try JavaScript approach
-            try:
-                # Try to find and click using JavaScript
-                driver.execute_script("""
-                    // Try to find Latest tab by text content
-                    const tabs = Array.from(document.querySelectorAll('[role="tab"]'));
-                    const latestTab = tabs.find(tab => 
-                        tab.textContent.toLowerCase().includes('latest') || 
-                        tab.getAttribute('href')?.includes('f=live')
-                    );
-                    
-                    if (latestTab) {
-                        latestTab.click();
-                        return true;
-                    }
-                    
-                    // Try to find by position (usually second tab)
-                    const tabList = document.querySelector('[role="tablist"]');
-                    if (tabList) {
-                        const secondTab = tabList.children[1];
-                        if (secondTab) {
-                            secondTab.click();
-                            return true;
-                        }
-                    }
-                    
-                    return false;
-                """)
-                logger.info("Attempted to click 'Latest' button using JavaScript")
-                time.sleep(2)
-            except Exception as e:
-                logger.warning(f"JavaScript click attempt failed: {str(e)}")
-            
-            # If we get here, we couldn't find the Latest button
-            logger.warning("Could not find 'Latest' button, continuing with default results")
-            return False
-            
-        except Exception as e:
-            logger.error(f"Error clicking 'Latest' button: {str(e)}")
             return False
\ No newline at end of file
@@ -1,71 +1,146 @@
 from datetime import UTC, datetime
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.common.keys import Keys
 from flask import jsonify
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 import os
+import queue
+import threading
+from urllib.parse import quote
 from models.twitter_result import TwitterResult
-import time
 
 logger = logging.getLogger(__name__)
 
+# Collects the fields of the first N tweets in a single round-trip to the browser. Written as a
+# function so it can be run through Runtime.evaluate; textContent matches BeautifulSoup's .text.
+_EXTRACT_TWEETS_JS = """
+(limit) => {
+    const articles = document.querySelectorAll("article[data-testid='tweet']");
+    const out = [];
+    for (let i = 0; i < Math.min(articles.length, limit); i++) {
+        const a = articles[i];
+        const nameEl = a.querySelector("div[data-testid='User-Name']");
+        const textEl = a.querySelector("div[data-testid='tweetText']");
+        const timeEl = a.querySelector("time");
+        const linkEl = a.querySelector("a[data-testid='tweetText'][href]") || a.querySelector("a[href*='/status/']");
+        out.push({
+            name: nameEl ? nameEl.textContent : null,
+            text: textEl ? textEl.textContent : '',
+            ts: timeEl ? timeEl.getAttribute('datetime') : null,
+            href: linkEl ? linkEl.getAttribute('href') : null
+        });
+    }
+    return out;
+}
+"""
+
+_COUNT_TWEETS_JS = "document.querySelectorAll(\"article[data-testid='tweet']\").length"
+
+_TWEET_STRAINER = SoupStrainer('article', attrs={'data-testid': 'tweet'})
+
+def _extract_tweet_url(tweet_div, base_url):
+    # Prefer the tweetText link; fall back to any link containing "/status/"
+    link = (tweet_div.find('a', {'data-testid': 'tweetText'}, href=True)
+            or tweet_div.find('a', href=lambda href: href and '/status/' in href))
+    return f"{base_url}{link['href']}" if link else None
+
+def _parse_tweets(html, num_posts, base_url):
+    """
+    Fallback for _EXTRACT_TWEETS_JS: pull the same fields out of tweet HTML with BeautifulSoup.
+    Kept at module level and free of driver state, so it stays picklable for a process pool.
+    Args:
+        html: outerHTML of the tweet articles, or a full page source
+        num_posts: Maximum number of tweets to parse
+        base_url: Prefix for the relative status links
+    Returns:
+        list: dicts with name, text, ts and url keys, the same shape the script path returns
+    """
+    # Only build the tweet article subtrees instead of the whole multi-megabyte document
+    soup = BeautifulSoup(html, 'lxml', parse_only=_TWEET_STRAINER)
+    
+    tweets = []
+    for tweet in soup.find_all('article', attrs={'data-testid': 'tweet'})[:num_posts]:
+        name_element = tweet.find('div', attrs={'data-testid': 'User-Name'})
+        text_element = tweet.find('div', attrs={'data-testid': 'tweetText'})
+        timestamp_element = tweet.find('time')
+        tweets.append({
+            'name': name_element.text if name_element else None,
+            'text': text_element.text if text_element else '',
+            'ts': timestamp_element.get('datetime') if timestamp_element else None,
+            'url': _extract_tweet_url(tweet, base_url)
+        })
+    return tweets
+
 class TwitterService:
-    def __init__(self, driver_service, cache_service):
+    def __init__(self, driver_service, cache_service, driver_pool):
         self.driver_service = driver_service
         self.cache_service = cache_service
+        self.driver_pool = driver_pool
+        self._refreshing = set()  # cache keys with a background refresh in flight
+        self._refresh_lock = threading.Lock()
         self.base_url = os.getenv('TWITTER_BASE_URL', 'https://x.com')  # Default to 'https://x.com' if not set
 
-    def perform_twitter_operation(self, url, search_queries, operation_type, isDefault=False):
-        cache_key = f'{operation_type}_posts_isDefault_{isDefault}'
-        
-        if self.cache_service.has(cache_key):
-            logger.info(f"Returning cached {operation_type} posts")
-            return self.cache_service.get(cache_key), []
-        
+    def perform_twitter_operation(self, url, search_queries, operation_type, isDefault=False, max_workers=None):
         if not search_queries:
             return None, ["No search queries provided"]
 
-        driver = None
+        # Different query sets must not share an entry
+        cache_key = f'{operation_type}_posts_isDefault_{isDefault}_{hash(tuple(sorted(search_queries)))}'
+        
+        # Stale-while-revalidate: serve any cached result, refreshing it in the background once it
+        # is older than the soft TTL. The cache itself evicts entries after the hard TTL.
+        cached, age = self.cache_service.get_with_age(cache_key)
+        if cached is not None:
+            if age > self.cache_service.soft_ttl:
+                self._refresh_in_background(cache_key, url, search_queries, operation_type, max_workers)
+            logger.info(f"Returning cached {operation_type} posts")
+            return cached, []
+
+        return self._fetch(cache_key, url, search_queries, operation_type, max_workers)
+
+    def _refresh_in_background(self, cache_key, url, search_queries, operation_type, max_workers):
+        """Re-run a cached operation on a background thread, at most once per key at a time"""
+        with self._refresh_lock:
+            if cache_key in self._refreshing:
+                return
+            self._refreshing.add(cache_key)
+
+        def refresh():
+            try:
+                logger.info(f"Refreshing stale cached {operation_type} posts")
+                self._fetch(cache_key, url, search_queries, operation_type, max_workers)
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(cache_key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _fetch(self, cache_key, url, search_queries, operation_type, max_workers):
+        """Scrape every query and cache the merged results under cache_key"""
+        # One logged-in driver per worker, never more than the pool can hand out
+        if max_workers is None:
+            max_workers = 4
+        num_workers = max(1, min(len(search_queries), max_workers, self.driver_pool.size))
+
+        pending = queue.Queue()
+        for search_query in search_queries:
+            pending.put(search_query)
+
         results = {}
         errors = []
+        lock = threading.Lock()
         try:
-            driver = self.driver_service.setup_driver()
-            driver.get(url)
-            self.driver_service.login(driver)
-            
-            self.check_login_success(driver)
-            driver.maximize_window() 
-            for search_query in search_queries:
-                try:
-                    if operation_type == 'channel':
-                        logger.info(f"Performing channel search for {search_query}")
-                        self.perform_channel_search(driver, search_query)
-                    else:
-                        logger.info(f"Performing search for {search_query}")
-                        self.perform_search(driver, search_query)
-                        
-                        # Click the "Latest" button to get the most recent tweets
-                        latest_clicked = self.driver_service.click_latest_button(driver)
-                        if latest_clicked:
-                            logger.info("Latest button clicked successfully, waiting for results to load...")
-                            # Wait for the page to update after clicking Latest (reduced from 5 to 2.5 seconds)
-                            time.sleep(2.5)
-                        else:
-                            logger.warning("Could not click Latest button, using default results")
-                    
-                    # Get the recent posts
-                    recent_posts = self.get_recent_posts(driver)
-                    results[search_query] = json.loads(recent_posts)
-                except Exception as e:
-                    error_message = f"Error processing query '{search_query}': {str(e)}"
-                    logger.error(error_message)
-                    errors.append(error_message)
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                futures = [
+                    executor.submit(self._run_worker, url, pending, operation_type, results, errors, lock)
+                    for _ in range(num_workers)
+                ]
+                for future in as_completed(futures):
+                    future.result()
 
             if results:  # Only cache if we have results
                 self.cache_service.set(cache_key, results)
@@ -76,19 +151,77 @@ class TwitterService:
             logger.error(error_message)
             errors.append(error_message)
             return None, errors
+
+    def _run_worker(self, url, pending, operation_type, results, errors, lock):
+        """Log in on one pooled driver and work through queries until the shared queue is empty"""
+        driver = None
+        try:
+            driver = self.driver_pool.acquire()
+            self._ensure_logged_in(driver, url)
+            while True:
+                try:
+                    search_query = pending.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    recent_posts = self._process_query(driver, search_query, operation_type)
+                    with lock:
+                        results[search_query] = recent_posts
+                except Exception as e:
+                    error_message = f"Error processing query '{search_query}': {str(e)}"
+                    logger.error(error_message)
+                    with lock:
+                        errors.append(error_message)
+        except Exception as e:
+            error_message = f"Error in perform_twitter_operation: {str(e)}"
+            logger.error(error_message)
+            with lock:
+                errors.append(error_message)
         finally:
             if driver:
                 try:
-                    self.driver_service.close_driver(driver)
+                    self.driver_pool.release(driver)
                 except Exception as e:
-                    logger.error(f"Error closing driver: {str(e)}")
+                    logger.error(f"Error releasing driver: {str(e)}")
+
+    def _ensure_logged_in(self, driver, url):
+        """Reuse the pooled driver's session (or saved cookies) and only run the full login when it has expired"""
+        # Only probe /home when there is a session to reuse; a fresh driver goes straight to login
+        has_session = (self.driver_service.has_session_cookie(driver, self.base_url)
+                       or (self.driver_service.load_cookies(driver)
+                           and self.driver_service.has_session_cookie(driver, self.base_url)))
+        if has_session:
+            self.driver_service.navigate(driver, f"{self.base_url}/home")
+            if self.driver_service.check_login_status(driver):
+                logger.info("Reusing logged-in session")
+                return
+            logger.info("Saved session has expired, logging in again")
+
+        # A warmed driver is already on the login page (and an expired session redirects there)
+        if "login" not in driver.current_url.lower():
+            self.driver_service.navigate(driver, url)
+        self.driver_service.login(driver)
+        self.check_login_success(driver)
+        self.driver_service.save_cookies(driver)
+
+    def _process_query(self, driver, search_query, operation_type):
+        """Run a single channel or keyword search on a logged-in driver and return its posts"""
+        if operation_type == 'channel':
+            logger.info(f"Performing channel search for {search_query}")
+            self.perform_channel_search(driver, search_query)
+        else:
+            logger.info(f"Performing search for {search_query}")
+            self.perform_search(driver, search_query)
+            
+        # Get the recent posts
+        return self.get_recent_posts(driver)
 
     def perform_channel_search(self, driver, search_query):
         url = f"{self.base_url}/{search_query}"
         try:
-            driver.get(url)
+            self.driver_service.navigate(driver, url)
             # Wait for either the ScrollSnap-List or the "account doesn't exist" message
-            element = WebDriverWait(driver, 10).until(
+            element = WebDriverWait(driver, 10, poll_frequency=0.1).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="ScrollSnap-List"], [data-testid="emptyState"]'))
             )
         
@@ -107,7 +240,7 @@ class TwitterService:
     
     def check_login_success(self, driver):
         try:
-            WebDriverWait(driver, 5).until(
+            WebDriverWait(driver, 5, poll_frequency=0.1).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="SideNav_AccountSwitcher_Button"]'))
             )
             logger.info("Login successful")
@@ -145,37 +278,12 @@ class TwitterService:
             raise
         
     def perform_search(self, driver, search_query):
-        search_input_selector = "[data-testid='SearchBox_Search_Input']"
+        # Load the Latest results directly instead of typing into the search box and clicking the
+        # Latest tab; f=live selects that tab
+        url = f"{self.base_url}/search?q={quote(search_query, safe='')}&f=live&src=typed_query"
         try:
-            search_input = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, search_input_selector))
-            )
-            
-            # Attempt 1: Use clear() method
-            search_input.clear()
-            if not search_input.get_attribute('value'):
-                logger.info("Input cleared successfully using clear() method")
-            else:
-                # Attempt 2: Use CTRL+A and BACKSPACE
-                ActionChains(driver).click(search_input).key_down(Keys.CONTROL).send_keys('a').key_up(Keys.CONTROL).send_keys(Keys.BACKSPACE).perform()
-                if not search_input.get_attribute('value'):
-                    logger.info("Input cleared successfully using CTRL+A and BACKSPACE")
-                else:
-                    # Attempt 3: Send a series of BACKSPACE keys
-                    current_value = search_input.get_attribute('value')
-                    for _ in range(len(current_value)):
-                        search_input.send_keys(Keys.BACKSPACE)
-                    if not search_input.get_attribute('value'):
-                        logger.info("Input cleared successfully using multiple BACKSPACE keys")
-                    else:
-                        logger.warning("Failed to clear input field")
-
-            search_input.send_keys(search_query)
-            search_input.send_keys(Keys.RETURN)
+            self.driver_service.navigate(driver, url)
             logger.info(f"Search performed with query: {search_query}")
-        except TimeoutException:
-            logger.error("Search input not found")
-            raise;
         except Exception as e:
             logger.error(f"Error during search for {search_query}: {str(e)}")
             raise;
@@ -184,17 +292,22 @@ class TwitterService:
         try:
             # Wait for tweets to load with a shorter timeout (10 seconds instead of 15)
             logger.info("Waiting for tweets to load...")
-            WebDriverWait(driver, 10).until(
+            WebDriverWait(driver, 10, poll_frequency=0.1).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "article[data-testid='tweet']"))
             )
             
-            # Add a shorter wait to ensure all tweets are fully loaded (reduced from 3 to 1 second)
-            time.sleep(1)
+            # Wait for the first batch of tweets to render instead of sleeping a fixed amount
+            try:
+                WebDriverWait(driver, 3, poll_frequency=0.1).until(
+                    lambda d: self._count_tweets(d) >= min(num_posts, 5)
+                )
+            except TimeoutException:
+                logger.info("Fewer tweets than expected rendered, continuing with what is loaded")
             
             # Scroll down to load more tweets if we need more than what's initially visible
             if num_posts > 5:
                 logger.info(f"Scrolling to load more tweets (target: {num_posts})")
-                tweets_found = len(driver.find_elements(By.CSS_SELECTOR, "article[data-testid='tweet']"))
+                tweets_found = self._count_tweets(driver)
                 scroll_attempts = 0
                 max_scroll_attempts = 5
                 
@@ -203,53 +316,50 @@ class TwitterService:
                     driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
                     scroll_attempts += 1
                     
-                    # Wait for new tweets to load (reduced from 2 to 1 second)
-                    time.sleep(1)
-                    
-                    # Count tweets again
-                    new_count = len(driver.find_elements(By.CSS_SELECTOR, "article[data-testid='tweet']"))
-                    
-                    # If no new tweets were loaded, break the loop
-                    if new_count == tweets_found:
+                    # Wait for new tweets to load; if none arrive, stop scrolling
+                    try:
+                        WebDriverWait(driver, 3, poll_frequency=0.1).until(
+                            lambda d: self._count_tweets(d) > tweets_found
+                        )
+                    except TimeoutException:
                         logger.info(f"No new tweets loaded after scrolling, stopping at {tweets_found} tweets")
                         break
                     
+                    # Count tweets again
+                    new_count = self._count_tweets(driver)
+                    
                     tweets_found = new_count
                     logger.info(f"Found {tweets_found} tweets after scrolling {scroll_attempts} times")
             
-            # Get the page source and parse it with BeautifulSoup
-            page_source = driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
-            
-            # Find all tweet articles
-            tweets = soup.find_all('article', attrs={'data-testid': 'tweet'})
+            # Pull every field we need in one script call; fall back to parsing the page source
+            try:
+                tweets = self.driver_service.evaluate(driver, f"({_EXTRACT_TWEETS_JS})({int(num_posts)})")
+                for tweet in tweets:
+                    tweet['url'] = f"{self.base_url}{tweet['href']}" if tweet.get('href') else None
+            except Exception as e:
+                logger.warning(f"Script extraction failed, parsing tweet HTML instead: {str(e)}")
+                tweets = _parse_tweets(self._get_tweets_html(driver, num_posts), num_posts, self.base_url)
             
             recent_posts = []
             logger.info(f"Number of tweets found: {len(tweets)}")
             
             # Process each tweet
-            for tweet in tweets[:num_posts]:
+            for tweet in tweets:
                 try:
-                    embed_url = self.__extract_tweet_url(tweet)
+                    embed_url = tweet['url']
                     if self.is_invalid_embed_url(embed_url):
                         logger.info(f"Invalid embed URL: {embed_url}")
                         continue
                     
-                    full_name = tweet.find('div', attrs={'data-testid': 'User-Name'}).text
-                    channel, username = full_name.split('@', 1)
+                    channel, username = tweet['name'].split('@', 1)
                     username = '@' + username  # Add @ back to the username
                     
-                    # Extract tweet text
-                    tweet_text = tweet.find('div', attrs={'data-testid': 'tweetText'}).text if tweet.find('div', attrs={'data-testid': 'tweetText'}) else ''
-                    
-                    # Extract timestamp
-                    timestamp_element = tweet.find('time')
-                    timestamp = timestamp_element['datetime'] if timestamp_element else datetime.now(UTC).isoformat()
+                    timestamp = tweet['ts'] or datetime.now(UTC).isoformat()
                     
                     tweet_obj = TwitterResult(  
                         channel=channel,
                         username=username,
-                        description=tweet_text,
+                        description=tweet['text'] or '',
                         published_date=timestamp,
                         embed_url=embed_url
                     )
@@ -259,43 +369,28 @@ class TwitterService:
                     continue
               
             logger.info(f"Retrieved {len(recent_posts)} recent posts")
-            tweet_dicts = [tweet.__dict__ for tweet in recent_posts]
-
-            # Convert the list of dictionaries to JSON
-            json_data = json.dumps(tweet_dicts, default=self.__datetime_to_iso)
-            return json_data
+            # Timestamps are already ISO strings, so the dicts can go straight into the cache and jsonify
+            return [tweet.__dict__ for tweet in recent_posts]
         except Exception as e:
             logger.error(f"Error retrieving recent posts: {str(e)}")
             raise
     
     # private method region
-    def __extract_tweet_url(self, tweet_div):
-        # Look for a link with data-testid="tweetText"
-        tweet_link = tweet_div.find('a', {'data-testid': 'tweetText'})
-        
-        if tweet_link and 'href' in tweet_link.attrs:
-            # Extract the relative URL
-            relative_url = tweet_link['href']
-            
-            # Construct the full URL
-            full_url = f"{self.base_url}{relative_url}"
-            return full_url
-        
-        # Fallback: look for any link containing "/status/"
-        status_link = tweet_div.find('a', href=lambda href: href and '/status/' in href)
-        
-        if status_link and 'href' in status_link.attrs:
-            relative_url = status_link['href']
-            full_url = f"{self.base_url}{relative_url}"
-            return full_url
-        
-        # If no suitable link is found
-        return None
+    def _count_tweets(self, driver):
+        return self.driver_service.evaluate(driver, _COUNT_TWEETS_JS) or 0
+
+    def _get_tweets_html(self, driver, num_posts):
+        """Fetch just the outerHTML of the first N tweet articles over CDP instead of the whole page_source"""
+        expression = (
+            "Array.from(document.querySelectorAll(\"article[data-testid='tweet']\"))"
+            f".slice(0, {int(num_posts)}).map(a => a.outerHTML).join('')"
+        )
+        try:
+            return self.driver_service.evaluate(driver, expression) or ''
+        except Exception as e:
+            logger.warning(f"Could not fetch tweet HTML over CDP, using page source: {str(e)}")
+            return driver.page_source
 
-    def __datetime_to_iso(self,obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        raise TypeError("Type not serializable")
-    
     def is_invalid_embed_url(self, embed_url):
-        return not embed_url or embed_url == '' or embed_url.strip().endswith('/analytics')
+        # hrefs read from the DOM carry no surrounding whitespace
+        return not embed_url or embed_url.endswith('/analytics')
\ No newline at end of file